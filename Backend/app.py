@@ -3,20 +3,68 @@ ULTRA-STRICT Event Intelligence Platform API
 ZERO unnecessary API calls - Only when explicitly requested
 """
 
-from fastapi import FastAPI, HTTPException
+import os
+import sys
+import logging
+import hashlib
+import anyio.to_thread
+import orjson
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import fields
 import uvicorn
 
-from engines.event_engine import SmartEventEngine
-from engines.attendee_engine import SmartAttendeeEngine
-from services.twitter_client import TwitterClient
+from engines.event_engine import SmartEventEngine, ResearchEvent
+from engines.attendee_engine import SmartAttendeeEngine, ResearchAttendee
+from services.response_cache import ResponseCache
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Cached responses are served without touching Twitter/SerpAPI
+EVENTS_CACHE_TTL = 3600
+ATTENDEES_CACHE_TTL = 900
+
+# Browsers may reuse an unchanged result for this long (seconds)
+CLIENT_CACHE_MAX_AGE = 300
+
+# Engines do blocking HTTP, so each in-flight request holds one worker thread
+THREADPOOL_SIZE = 100
+
+# Slotted dataclasses have no __dict__ - serialize from precomputed field names
+# (init=False fields are internal caches, not part of the API)
+_EVENT_FIELDS = tuple(f.name for f in fields(ResearchEvent) if f.init)
+_ATTENDEE_FIELDS = tuple(f.name for f in fields(ResearchAttendee) if f.init)
+
+# Per-worker state, created in lifespan so every process gets its own
+# Twitter/SerpAPI clients and Redis pool - NO AUTO API CALLS
+event_engine: Optional[SmartEventEngine] = None
+attendee_engine: Optional[SmartAttendeeEngine] = None
+response_cache: Optional[ResponseCache] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global event_engine, attendee_engine, response_cache
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    event_engine = SmartEventEngine()
+    attendee_engine = SmartAttendeeEngine()
+    response_cache = ResponseCache(os.getenv('REDIS_URL'))
+    yield
+    await response_cache.close()
 
 app = FastAPI(
     title="Event Intelligence Platform",
     description="ULTRA-STRICT: Zero unnecessary API calls - Only when explicitly requested",
-    version="4.0"
+    version="4.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -25,110 +73,148 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Initialize engines - NO AUTO API CALLS
-twitter_client = TwitterClient()
-event_engine = SmartEventEngine()
-attendee_engine = SmartAttendeeEngine()
+def _iter_json_results(list_key: str, items: Iterable, field_names: Tuple[str, ...], meta: Dict) -> Iterator[bytes]:
+    """Encode {"success": true, list_key: [...], **meta} one item at a time"""
+    yield b'{"success":true,"' + list_key.encode() + b'":['
+    for index, item in enumerate(items):
+        if index:
+            yield b','
+        yield orjson.dumps({k: getattr(item, k) for k in field_names}, default=str)
+    yield b'],' + orjson.dumps(meta, default=str)[1:]  # meta keys close the object
 
+def _conditional_json_response(http_request: Request, body: bytes) -> Response:
+    """JSON response tagged with an ETag - 304 with no body if the client already has it"""
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CLIENT_CACHE_MAX_AGE}"}
+    
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match:
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in client_tags:
+            return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Invalid requests are rejected by Pydantic before any engine code runs
 class EventDiscoveryRequest(BaseModel):
-    location: str
-    start_date: str
-    end_date: str
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    location: str = Field(..., min_length=2, max_length=100)
+    start_date: str = Field(..., pattern=r'^\d{4}-\d{2}-\d{2}$')
+    end_date: str = Field(..., pattern=r'^\d{4}-\d{2}-\d{2}$')
     categories: List[str]
-    max_results: int  # STRICT: User-defined limit
+    max_results: int = Field(..., ge=1, le=20)  # STRICT: User-defined limit
 
 class AttendeeDiscoveryRequest(BaseModel):
-    event_name: str
-    max_results: int  # STRICT: User-defined limit
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    event_name: str = Field(..., min_length=2, max_length=100)
+    max_results: int = Field(..., ge=1, le=30)  # STRICT: User-defined limit
+
+# Static responses encoded once at import - no per-request serialization
+_ROOT_BYTES = orjson.dumps({
+    "message": "🎪 ULTRA-STRICT Event Intelligence Platform",
+    "status": "ready",
+    "version": "4.0",
+    "api_policy": "ZERO auto API calls - Only when explicitly requested",
+    "features": {
+        "strict_api_limits": True,
+        "user_controlled_results": True,
+        "minimal_api_calls": True
+    }
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "strict_limits": True,
+    "version": "4.0",
+    "api_calls_made": 0  # Always zero - no auto calls
+})
 
 @app.get("/")
 async def root():
-    return {
-        "message": "🎪 ULTRA-STRICT Event Intelligence Platform",
-        "status": "ready",
-        "version": "4.0",
-        "api_policy": "ZERO auto API calls - Only when explicitly requested",
-        "features": {
-            "strict_api_limits": True,
-            "user_controlled_results": True,
-            "minimal_api_calls": True
-        }
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/api/health")
 async def health_check():
     """Health check that makes NO API calls"""
-    return {
-        "status": "healthy",
-        "strict_limits": True,
-        "version": "4.0",
-        "api_calls_made": 0  # Always zero - no auto calls
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.post("/api/discover-events")
-async def discover_events(request: EventDiscoveryRequest):
+async def discover_events(request: EventDiscoveryRequest, http_request: Request):
     """ULTRA-STRICT event discovery - ONLY when explicitly called"""
     try:
-        print(f"🎯 ULTRA-STRICT EVENT REQUEST: {request.max_results} events in {request.location}")
+        logger.info("🎯 ULTRA-STRICT EVENT REQUEST: %s events in %s", request.max_results, request.location)
         
-        # Validate max results
-        if request.max_results > 20:
-            request.max_results = 20
+        async def compute():
+            events = await run_in_threadpool(
+                event_engine.discover_events,
+                location=request.location,
+                start_date=request.start_date,
+                end_date=request.end_date,
+                categories=request.categories,
+                max_results=request.max_results
+            )
+            
+            body = b"".join(_iter_json_results("events", events, _EVENT_FIELDS, {
+                "total_events": len(events),
+                "requested_limit": request.max_results,
+                "location": request.location,
+                "api_calls_used": 1,  # Only 1 API call made
+                "engine": "ULTRA-STRICT EventEngine v4.0"
+            }))
+            return body, bool(events)  # Never cache empty/failed lookups
         
-        events = event_engine.discover_events(
-            location=request.location,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            categories=request.categories,
-            max_results=request.max_results
-        )
-        
-        return {
-            "success": True,
-            "events": [event.__dict__ for event in events],
-            "total_events": len(events),
-            "requested_limit": request.max_results,
-            "location": request.location,
-            "api_calls_used": 1,  # Only 1 API call made
-            "engine": "ULTRA-STRICT EventEngine v4.0"
-        }
+        cache_key = ResponseCache.make_key("events", request.model_dump())
+        body = await response_cache.get_or_compute(cache_key, compute, EVENTS_CACHE_TTL)
+        return _conditional_json_response(http_request, body)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/discover-attendees")
-async def discover_attendees(request: AttendeeDiscoveryRequest):
+async def discover_attendees(request: AttendeeDiscoveryRequest, http_request: Request):
     """ULTRA-STRICT attendee discovery - ONLY when explicitly called"""
     try:
-        print(f"🎯 ULTRA-STRICT ATTENDEE REQUEST: {request.max_results} attendees for {request.event_name}")
-        
-        # Validate max results
-        if request.max_results > 30:
-            request.max_results = 30
+        logger.info("🎯 ULTRA-STRICT ATTENDEE REQUEST: %s attendees for %s", request.max_results, request.event_name)
         
-        attendees = attendee_engine.discover_attendees(
-            event_name=request.event_name,
-            max_results=request.max_results
-        )
+        async def compute():
+            # Identical concurrent requests share this one call via get_or_compute
+            attendees = await attendee_engine.discover_attendees(
+                event_name=request.event_name,
+                max_results=request.max_results
+            )
+            
+            body = b"".join(_iter_json_results("attendees", attendees, _ATTENDEE_FIELDS, {
+                "total_attendees": len(attendees),
+                "requested_limit": request.max_results,
+                "event_name": request.event_name,
+                "api_calls_used": 1,  # Only 1 API call made
+                "engine": "ULTRA-STRICT AttendeeEngine v4.0"
+            }))
+            return body, bool(attendees)  # Never cache empty/failed lookups
         
-        return {
-            "success": True,
-            "attendees": [attendee.__dict__ for attendee in attendees],
-            "total_attendees": len(attendees),
-            "requested_limit": request.max_results,
-            "event_name": request.event_name,
-            "api_calls_used": 1,  # Only 1 API call made
-            "engine": "ULTRA-STRICT AttendeeEngine v4.0"
-        }
+        cache_key = ResponseCache.make_key("attendees", request.model_dump())
+        body = await response_cache.get_or_compute(cache_key, compute, ATTENDEES_CACHE_TTL)
+        return _conditional_json_response(http_request, body)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    print("🚀 ULTRA-STRICT Event Intelligence Platform Starting...")
-    print("🎯 POLICY: ZERO unnecessary API calls")
-    print("📡 API: http://localhost:8000")
-    print("🔒 API calls only when: User clicks DISCOVER EVENTS or FIND ATTENDEES")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    logger.info("🚀 ULTRA-STRICT Event Intelligence Platform Starting...")
+    logger.info("🎯 POLICY: ZERO unnecessary API calls")
+    logger.info("📡 API: http://localhost:8000")
+    logger.info("🔒 API calls only when: User clicks DISCOVER EVENTS or FIND ATTENDEES")
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        log_level=os.getenv("LOG_LEVEL", "INFO").lower()
+    )
@@ -4,13 +4,27 @@ PROPER Twitter API error handling and rate limiting
 """
 
 import re
+import time
+import heapq
+import asyncio
 import logging
-from typing import List, Dict
+from functools import lru_cache, partial
+from typing import List, Dict, FrozenSet
 from dataclasses import dataclass
 
-from services.twitter_client import TwitterClient
+import anyio.to_thread
 
-@dataclass
+from services.twitter_client import get_twitter_client
+
+logger = logging.getLogger(__name__)
+
+# Strips punctuation from event names before building Twitter queries
+_SANITIZE_RE = re.compile(r'[^\w\s]')
+
+# Splits tweets and event names into words for relevance matching
+_TOKEN_RE = re.compile(r'\w+')
+
+@dataclass(slots=True, frozen=True)
 class ResearchAttendee:
     attendee_name: str
     username: str
@@ -22,59 +36,82 @@ class ResearchAttendee:
     source_tweet: str
     posted_by: str
 
+@lru_cache(maxsize=256)
+def _event_tokens(event_name: str) -> FrozenSet[str]:
+    """The event's significant words (cached per event)"""
+    return frozenset(word for word in _TOKEN_RE.findall(event_name.casefold()) if len(word) > 3)
+
 class SmartAttendeeEngine:
+    OPERATIONAL_CHECK_TTL = 5.0  # seconds
+    
     def __init__(self):
-        self.twitter_client = TwitterClient()
+        self.twitter_client = get_twitter_client()
         self.attendee_patterns = self._load_attendee_patterns()
+        self._op_cache = (float('-inf'), False)  # (checked_at, operational)
         
     def _load_attendee_patterns(self):
-        return {
+        patterns = {
             'attending': ['attending', 'going to', 'see you at', 'can\'t wait for', 'excited for'],
             'interested': ['interested in', 'looking forward to', 'planning to attend', 'might go to'],
             'organizing': ['organizing', 'hosting', 'putting on', 'running']
         }
+        
+        # Relevance only needs a yes/no, so flatten the categories once at load time;
+        # the categorized dict is kept for the labels
+        self._all_patterns = tuple(pattern for pattern_list in patterns.values() for pattern in pattern_list)
+        
+        # Single compiled alternation: all patterns matched in one regex pass
+        self._pattern_re = re.compile("|".join(re.escape(p) for p in self._all_patterns), re.IGNORECASE)
+        
+        return patterns
     
-    def discover_attendees(self, event_name: str, max_results: int) -> List[ResearchAttendee]:
+    async def discover_attendees(self, event_name: str, max_results: int) -> List[ResearchAttendee]:
         """ULTRA-STRICT attendee discovery with PROPER error handling"""
         try:
-            print(f"🔍 Finding {max_results} real attendees for '{event_name}'")
+            logger.info("🔍 Finding %s real attendees for '%s'", max_results, event_name)
             
             # Check if Twitter client is operational
-            if not self.twitter_client or not self.twitter_client.is_operational():
-                print("❌ Twitter client not operational")
+            if not self._operational_cached():
+                logger.warning("❌ Twitter client not operational")
                 return []
             
-            # Build optimized query
-            query = self._build_single_query(event_name)
-            print(f"🐦 Making 1 Twitter API call: {query}")
+            # Build optimized queries
+            queries = self._build_queries(event_name)
+            logger.info("🐦 Making %s Twitter API call(s): %s", len(queries), queries)
             
             # Get real tweets from Twitter API
-            tweets = self._search_twitter_safe(query, max_results)
+            tweets = await self._search_twitter_safe(queries, max_results)
             
             if not tweets:
-                print("❌ No tweets found (rate limit or no results)")
+                logger.info("❌ No tweets found (rate limit or no results)")
                 return []
             
-            # Extract real attendees from tweets
-            attendees = self._extract_attendees_from_tweets(tweets, event_name)
-            
-            # Calculate confidence scores based on real data
-            scored_attendees = self._calculate_confidence_scores(attendees)
-            
-            final_attendees = scored_attendees[:max_results]
-            print(f"✅ Found {len(final_attendees)} real attendees from Twitter")
+            # Extract and score real attendees from tweets
+            final_attendees = self._rank_attendees(tweets, event_name, max_results)
+            logger.info("✅ Found %s real attendees from Twitter", len(final_attendees))
             
             return final_attendees
             
         except Exception as e:
-            logging.error(f"Attendee discovery error: {e}")
+            logger.error("Attendee discovery error: %s", e)
             return []
     
+    def _operational_cached(self) -> bool:
+        """Twitter client health, re-checked at most every OPERATIONAL_CHECK_TTL seconds"""
+        now = time.monotonic()
+        checked_at, operational = self._op_cache
+        if now - checked_at < self.OPERATIONAL_CHECK_TTL:
+            return operational
+        
+        operational = bool(self.twitter_client and self.twitter_client.is_operational())
+        self._op_cache = (now, operational)
+        return operational
+    
     def _build_single_query(self, event_name: str) -> str:
         """Build optimized Twitter search query"""
         try:
             # Clean event name and create search query
-            clean_name = re.sub(r'[^\w\s]', '', event_name).strip()
+            clean_name = _SANITIZE_RE.sub('', event_name).strip()
             
             if not clean_name:
                 return ""
@@ -84,138 +121,139 @@ class SmartAttendeeEngine:
             return query
             
         except Exception as e:
-            print(f"❌ Error building query: {e}")
+            logger.error("❌ Error building query: %s", e)
             return ""
     
-    def _search_twitter_safe(self, query: str, max_results: int) -> List[Dict]:
-        """Search Twitter with PROPER error handling"""
-        if not query:
-            print("❌ Empty query provided")
+    def _build_queries(self, event_name: str) -> List[str]:
+        """All query variants for one discovery - ULTRA-STRICT: a single query today"""
+        query = self._build_single_query(event_name)
+        return [query] if query else []
+    
+    async def _search_twitter_safe(self, queries: List[str], max_results: int) -> List[Dict]:
+        """Search Twitter with PROPER error handling - all query variants run concurrently"""
+        if not queries:
+            logger.warning("❌ Empty query provided")
             return []
             
         try:
-            print(f"🐦 Twitter API call for: {query}")
-            
             # Calculate needed tweets (with buffer for filtering)
             tweets_needed = max(10, min(max_results * 3, 100))  # Min 10, max 100
             
-            tweets = self.twitter_client.search_recent_tweets_safe(
-                query=query,
-                max_results=tweets_needed,
-                tweet_fields=['author_id', 'created_at', 'text', 'public_metrics'],
-                user_fields=['username', 'name', 'verified', 'description', 'location', 'public_metrics'],
-                expansions=['author_id']
-            )
-            
-            if not tweets or not tweets.data:
-                print("❌ No tweets found in API response")
-                return []
-            
-            users_dict = {}
-            if tweets.includes and 'users' in tweets.includes:
-                for user in tweets.includes['users']:
-                    users_dict[user.id] = user
+            # TwitterClient is blocking - each variant runs in its own worker thread
+            responses = await asyncio.gather(*(
+                anyio.to_thread.run_sync(partial(
+                    self.twitter_client.search_recent_tweets_safe,
+                    query=query,
+                    max_results=tweets_needed,
+                    tweet_fields=['author_id', 'created_at', 'text', 'public_metrics'],
+                    user_fields=['username', 'name', 'verified', 'description', 'location', 'public_metrics'],
+                    expansions=['author_id']
+                ))
+                for query in queries
+            ), return_exceptions=True)
             
-            processed_tweets = []
-            for tweet in tweets.data:
-                user = users_dict.get(tweet.author_id)
-                if user:
-                    processed_tweets.append({
-                        'text': tweet.text,
-                        'url': f"https://twitter.com/{user.username}/status/{tweet.id}",
-                        'username': user.username,
-                        'name': user.name,
-                        'bio': user.description or '',
-                        'location': user.location or '',
-                        'followers_count': user.public_metrics.get('followers_count', 0) if hasattr(user, 'public_metrics') else 0,
-                        'verified': user.verified or False,
-                        'created_at': tweet.created_at,
-                        'query': query
-                    })
+            # One entry per user, keeping their highest-engagement tweet as the source
+            tweets_by_user = {}
+            for query, tweets in zip(queries, responses):
+                if isinstance(tweets, Exception):
+                    logger.error("❌ Twitter API call failed for %s: %s", query, tweets)
+                    continue
+                
+                if not tweets or not tweets.data:
+                    logger.info("❌ No tweets found in API response for: %s", query)
+                    continue
+                
+                users_dict = {}
+                if tweets.includes and 'users' in tweets.includes:
+                    for user in tweets.includes['users']:
+                        users_dict[user.id] = user
+                
+                for tweet in tweets.data:
+                    user = users_dict.get(tweet.author_id)
+                    if not user:
+                        continue
+                    
+                    metrics = tweet.public_metrics or {}
+                    engagement = metrics.get('like_count', 0) + metrics.get('retweet_count', 0)
+                    current = tweets_by_user.get(user.id)
+                    if current is None or engagement > current['engagement']:
+                        tweets_by_user[user.id] = {
+                            'text': tweet.text,
+                            'tokens': frozenset(_TOKEN_RE.findall(tweet.text.casefold())),
+                            'url': f"https://twitter.com/{user.username}/status/{tweet.id}",
+                            'username': user.username,
+                            'name': user.name,
+                            'bio': user.description or '',
+                            'location': user.location or '',
+                            'followers_count': user.public_metrics.get('followers_count', 0) if hasattr(user, 'public_metrics') else 0,
+                            'verified': user.verified or False,
+                            'created_at': tweet.created_at,
+                            'engagement': engagement,
+                            'query': query
+                        }
             
-            print(f"✅ Got {len(processed_tweets)} real tweets from Twitter API")
+            processed_tweets = list(tweets_by_user.values())
+            logger.info("✅ Got %s real tweets from Twitter API", len(processed_tweets))
             return processed_tweets
             
         except Exception as e:
-            print(f"❌ Twitter API call failed: {e}")
+            logger.error("❌ Twitter API call failed: %s", e)
             return []
     
-    def _extract_attendees_from_tweets(self, tweets: List[Dict], event_name: str) -> List[ResearchAttendee]:
-        """Extract REAL attendees from tweets"""
-        attendees = []
+    def _rank_attendees(self, tweets: List[Dict], event_name: str, max_results: int) -> List[ResearchAttendee]:
+        """Filter, score and keep the top max_results REAL attendees in a single pass"""
+        heap = []  # min-heap of (score, -index, tweet) holding the best max_results
         
-        if not tweets:
-            return attendees
-            
-        for tweet in tweets:
+        for index, tweet in enumerate(tweets):
             try:
                 # Check if tweet is relevant to the event
-                if not self._is_relevant_tweet(tweet['text'], event_name):
+                if not self._is_relevant_tweet(tweet['text'], tweet['tokens'], event_name):
                     continue
                 
-                # Create attendee from REAL tweet data
-                attendee = ResearchAttendee(
-                    attendee_name=tweet['name'],
-                    username=f"@{tweet['username']}",
-                    bio=tweet['bio'],
-                    location=tweet['location'],
-                    followers_count=tweet['followers_count'],
-                    verified=tweet['verified'],
-                    confidence_score=0.8,  # Based on real tweet
-                    source_tweet=tweet['url'],
-                    posted_by=f"@{tweet['username']}"  # Real Twitter user
-                )
-                attendees.append(attendee)
+                # Base score for real data + verified, followers, bio and location bonuses
+                score = min(0.7
+                            + 0.2 * tweet['verified']
+                            + 0.1 * (tweet['followers_count'] > 1000)
+                            + 0.1 * (len(tweet['bio']) > 20)
+                            + 0.1 * bool(tweet['location']), 0.95)
+                
+                # -index keeps earlier tweets ahead of later ones with the same score
+                entry = (score, -index, tweet)
+                if len(heap) < max_results:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
                     
             except Exception as e:
                 continue  # Skip problematic tweets
         
-        return attendees
+        # Create attendees from REAL tweet data, best first
+        return [
+            ResearchAttendee(
+                attendee_name=tweet['name'],
+                username=f"@{tweet['username']}",
+                bio=tweet['bio'],
+                location=tweet['location'],
+                followers_count=tweet['followers_count'],
+                verified=tweet['verified'],
+                confidence_score=score,
+                source_tweet=tweet['url'],
+                posted_by=f"@{tweet['username']}"  # Real Twitter user
+            )
+            for score, _, tweet in sorted(heap, reverse=True)
+        ]
     
-    def _is_relevant_tweet(self, text: str, event_name: str) -> bool:
+    def _is_relevant_tweet(self, text: str, tokens: FrozenSet[str], event_name: str) -> bool:
         """Check if tweet is relevant to the event"""
         if not text or not event_name:
             return False
             
-        text_lower = text.lower()
-        event_lower = event_name.lower()
-        
-        # Check for event name or keywords
-        event_words = event_lower.split()
-        if any(word in text_lower for word in event_words if len(word) > 3):
+        # Check for event name or keywords (set intersection against the tweet's words)
+        if not _event_tokens(event_name).isdisjoint(tokens):
             return True
         
         # Check for attendee patterns
-        for pattern_list in self.attendee_patterns.values():
-            if any(pattern in text_lower for pattern in pattern_list):
-                return True
-        
-        return False
-    
-    def _calculate_confidence_scores(self, attendees: List[ResearchAttendee]) -> List[ResearchAttendee]:
-        """Calculate confidence scores based on REAL data"""
-        for attendee in attendees:
-            score = 0.7  # Base score for real data
-            
-            # Real verification status
-            if attendee.verified:
-                score += 0.2
-            
-            # Real follower count
-            if attendee.followers_count > 1000:
-                score += 0.1
-            
-            # Real bio length
-            if len(attendee.bio) > 20:
-                score += 0.1
-            
-            # Real location data
-            if attendee.location:
-                score += 0.1
-            
-            attendee.confidence_score = min(score, 0.95)
-        
-        return sorted(attendees, key=lambda x: x.confidence_score, reverse=True)
+        return bool(self._pattern_re.search(text))
     
     def get_twitter_status(self) -> Dict:
         """Get Twitter API status"""
@@ -4,17 +4,71 @@ Fixed SerpAPI queries and response handling
 """
 
 import re
-import requests
 import os
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from operator import attrgetter
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+from typing import Iterator, List, Dict, Set, Tuple, Optional
+from dataclasses import dataclass, asdict, field
+import ahocorasick
+import orjson
+import requests_cache
 from dotenv import load_dotenv
+from intervaltree import Interval, IntervalTree
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+SERPAPI_URL = "https://serpapi.com/search"
+
+# Persistent HTTP cache for SerpAPI responses (survives restarts); stale entries are
+# revalidated with If-None-Match/If-Modified-Since when SerpAPI sends validators
+SERPAPI_CACHE_PATH = os.getenv('SERP_CACHE_PATH', 'serp_cache')
+SERPAPI_CACHE_EXPIRE = timedelta(hours=6)
+
+# Concurrent SerpAPI queries per discovery; queries still queued when enough events
+# have arrived are cancelled, so a small pool keeps the early-exit saving calls
+SERPAPI_MAX_WORKERS = 4
+
+# Cached date ranges kept per location and category
+CACHE_MAX_RANGES = 5
+
+# Cached spans are dropped (and re-fetched) after this long - matches the HTTP cache,
+# so a re-fetch reaches SerpAPI and picks up newly announced events
+CACHE_SPAN_TTL_SECONDS = SERPAPI_CACHE_EXPIRE.total_seconds()
+
+# Eviction weights on top of LRU order: keep ranges holding many events, drop
+# ranges spanning many days for few events. Both 0 = pure LRU
+CACHE_EVICT_ALPHA = 0.5  # weight of normalized event count
+CACHE_EVICT_BETA = 0.25  # weight of normalized day span
+
+# Date formats SerpAPI returns, tried in order
+_DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%b %d, %Y',
+    '%B %d, %Y', 
+    '%d %b %Y',
+    '%d %B %Y',
+    '%m/%d/%Y',
+    '%d/%m/%Y'
+)
+
+# Common date patterns in event descriptions
+_DATE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(\d{4}-\d{2}-\d{2})',
+    r'(\d{1,2}/\d{1,2}/\d{4})',
+    r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})',
+))
+
+@dataclass(slots=True, frozen=True)
 class ResearchEvent:
     event_name: str
     exact_date: str
@@ -24,233 +78,452 @@ class ResearchEvent:
     confidence_score: float
     source_tweet: str
     posted_by: str
+    _date_obj: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    _dedup_key: str = field(default='', init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen instance - derived fields are set once via object.__setattr__
+        # Normalized once here so deduplication is a plain set lookup
+        object.__setattr__(self, '_dedup_key', f"{self.event_name.lower().strip()}|{self.exact_date}")
+        
+        # Parsed once here so cache lookups compare datetimes without re-parsing
+        try:
+            date_obj = datetime.fromisoformat(self.exact_date)
+        except (TypeError, ValueError):
+            date_obj = None
+        object.__setattr__(self, '_date_obj', date_obj)
+
+# Event type keywords, checked in priority order (first category listed wins)
+_EVENT_TYPE_KEYWORDS = (
+    ('music', ('concert', 'music', 'dj', 'band', 'live music')),
+    ('conference', ('conference', 'summit', 'workshop', 'business', 'tech')),
+    ('festival', ('festival', 'cultural', 'celebration')),
+    ('sports', ('sports', 'game', 'match', 'tournament', 'race')),
+    ('arts', ('art', 'theater', 'exhibition', 'gallery', 'museum')),
+    ('food', ('food', 'drink', 'culinary', 'wine', 'beer')),
+    ('family', ('family', 'kids', 'children')),
+    ('comedy', ('comedy', 'standup', 'improv')),
+)
+
+def _build_event_type_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each keyword to (priority, category)"""
+    automaton = ahocorasick.Automaton()
+    for priority, (category, keywords) in enumerate(_EVENT_TYPE_KEYWORDS):
+        for keyword in keywords:
+            if not automaton.exists(keyword):
+                automaton.add_word(keyword, (priority, category))
+    automaton.make_automaton()
+    return automaton
+
+_EVENT_TYPE_AUTOMATON = _build_event_type_automaton()
+
+# Event cache entries are per (location, category)
+CacheKey = Tuple[str, str]
 
 class SmartEventEngine:
     def __init__(self):
         self.serp_api_key = os.getenv('SERP_API_KEY')
-        self.event_cache = {}
+        # All cache state is keyed by (location, category) - the SerpAPI query
+        # set depends on the category, so coverage for one says nothing about another
+        self.event_cache: Dict[CacheKey, IntervalTree] = {}  # key -> ranges of cached events
+        self._cache_order: Dict[CacheKey, OrderedDict] = {}  # key -> range -> Interval, least recently used first
+        self._dedup_index: Dict[CacheKey, Set[str]] = {}  # key -> dedup keys of every cached event
+        self._partial_ranges: Dict[CacheKey, Set[Tuple[int, int]]] = {}  # key -> spans whose fetch was cut short
+        self._fetched_at: Dict[CacheKey, Dict[Tuple[int, int], float]] = {}  # key -> span -> monotonic fetch time
+        # Guards all of the cache state above - discover_events runs on many threads at once
+        self._lock = threading.Lock()
+        
+        # One pooled, HTTP-caching session so concurrent queries reuse TCP/TLS connections
+        # and repeated queries skip SerpAPI (api_key is kept out of the cache keys)
+        self._session = requests_cache.CachedSession(
+            SERPAPI_CACHE_PATH,
+            backend='sqlite',
+            expire_after=SERPAPI_CACHE_EXPIRE,
+            cache_control=True,
+            ignored_parameters=['api_key']
+        )
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
         
     def discover_events(self, location: str, start_date: str, end_date: str, categories: List[str], max_results: int) -> List[ResearchEvent]:
         """Smart event discovery with caching and mixed results"""
         try:
-            print(f"🔍 SMART CACHE: Finding {max_results} events in {location} ({start_date} to {end_date})")
+            logger.info("🔍 SMART CACHE: Finding %s events in %s (%s to %s)", max_results, location, start_date, end_date)
             
-            # Check cache for matching date ranges
-            cached_events = self._get_cached_events(location, start_date, end_date)
-            print(f"📦 Found {len(cached_events)} cached events")
+            category = categories[0] if categories else "all"
+            cache_key = (location, category)
+            
+            with self._lock:
+                self._expire_stale_spans(cache_key)
+                
+                # Check cache for matching date ranges
+                cached_events = self._get_cached_events(cache_key, start_date, end_date)
+                
+                # Only dates never fully fetched before are worth a SerpAPI call
+                gaps = self._uncovered_ranges(cache_key, start_date, end_date)
+            logger.info("📦 Found %s cached events", len(cached_events))
             
             # Calculate how many new events we need
             needed_new_events = max(0, max_results - len(cached_events))
             
             new_events = []
-            if needed_new_events > 0:
-                print(f"🔄 Need {needed_new_events} new events")
-                new_events = self._get_new_events_serpapi(
+            final_events = cached_events
+            if needed_new_events > 0 and gaps:
+                # One fetch spanning all gaps - SerpAPI queries aren't date-scoped,
+                # so per-gap calls would return the same results
+                fetch_range = (gaps[0][0], gaps[-1][1])
+                fetch_start, fetch_end = self._format_range(fetch_range).split('_')
+                logger.info("🔄 Need %s new events (%s to %s not cached)", needed_new_events, fetch_start, fetch_end)
+                
+                # Re-fetching a partial span finds its cached events again - ask for those too
+                refetched = sum(1 for event in cached_events
+                                if fetch_range[0] <= event._date_obj.toordinal() < fetch_range[1])
+                # The cache lock is not held here - other requests proceed during the fetch
+                new_events, complete = self._get_new_events_serpapi(
                     location=location,
-                    start_date=start_date,
-                    end_date=end_date,
-                    category=categories[0] if categories else "all",
-                    max_results=needed_new_events
+                    start_date=fetch_start,
+                    end_date=fetch_end,
+                    category=category,
+                    max_results=needed_new_events + refetched
                 )
                 
-                # Cache the new events only if we found some
-                if new_events:
-                    self._cache_events(location, start_date, end_date, new_events)
-            
-            # Combine cached + new events
-            all_events = cached_events + new_events
+                with self._lock:
+                    # Cached spans are kept duplicate-free, so only the fresh batch needs checking
+                    cached_keys = self._dedup_index.get(cache_key, ())
+                    new_events = [event for event in new_events if event._dedup_key not in cached_keys]
+                    
+                    # A complete fetch is always recorded - even with nothing new it marks
+                    # the span covered (or no longer partial). A cut-short fetch is cached
+                    # as partial so a later, larger request fetches the span again
+                    if new_events or complete:
+                        self._cache_events(cache_key, fetch_start, fetch_end, new_events, complete)
+                    
+                    # Re-read so events cached by concurrent requests meanwhile are included
+                    final_events = self._get_cached_events(cache_key, start_date, end_date)
+            elif needed_new_events > 0:
+                logger.info("📦 %s to %s already fetched - no SerpAPI call", start_date, end_date)
             
-            # Remove duplicates and limit to max_results
-            final_events = self._remove_duplicates(all_events)[:max_results]
+            # Cached and new events are disjoint - limit to max_results
+            final_events = final_events[:max_results]
             
-            print(f"✅ SMART RESULTS: {len(cached_events)} cached + {len(new_events)} new = {len(final_events)} total")
+            logger.info("✅ SMART RESULTS: %s cached + %s new = %s total", len(cached_events), len(new_events), len(final_events))
             
             return final_events
             
         except Exception as e:
-            print(f"❌ Smart event discovery error: {e}")
+            logger.error("❌ Smart event discovery error: %s", e)
             return []
     
-    def _get_cached_events(self, location: str, start_date: str, end_date: str) -> List[ResearchEvent]:
+    def _get_cached_events(self, cache_key: CacheKey, start_date: str, end_date: str) -> List[ResearchEvent]:
         """Get events from cache that match the date range"""
         cached_events = []
         
-        if location not in self.event_cache:
+        tree = self.event_cache.get(cache_key)
+        if not tree:
             return []
         
         search_start = datetime.strptime(start_date, '%Y-%m-%d')
         search_end = datetime.strptime(end_date, '%Y-%m-%d')
         
-        for cached_range, events in self.event_cache[location].items():
-            cache_start_str, cache_end_str = cached_range.split('_')
-            cache_start = datetime.strptime(cache_start_str, '%Y-%m-%d')
-            cache_end = datetime.strptime(cache_end_str, '%Y-%m-%d')
+        # Only cached ranges overlapping the search range - O(log n + k), oldest dates first
+        order = self._cache_order[cache_key]
+        overlapping = tree.overlap(search_start.toordinal(), search_end.toordinal() + 1)
+        for interval in sorted(overlapping, key=attrgetter('begin', 'end')):
+            order.move_to_end((interval.begin, interval.end))  # Mark as recently used
             
-            # Check if search range overlaps with cached range
-            if self._ranges_overlap(search_start, search_end, cache_start, cache_end):
-                # Filter events that fall within search range
-                for event in events:
-                    try:
-                        event_date = datetime.strptime(event.exact_date, '%Y-%m-%d')
-                        if search_start <= event_date <= search_end:
-                            cached_events.append(event)
-                    except:
-                        continue
+            # Filter events that fall within search range
+            for event in interval.data:
+                event_date = event._date_obj
+                if event_date is not None and search_start <= event_date <= search_end:
+                    cached_events.append(event)
         
         return cached_events
     
-    def _ranges_overlap(self, start1: datetime, end1: datetime, start2: datetime, end2: datetime) -> bool:
-        """Check if two date ranges overlap"""
-        return not (end1 < start2 or start1 > end2)
+    def _uncovered_ranges(self, cache_key: CacheKey, start_date: str, end_date: str) -> List[Tuple[int, int]]:
+        """Ordinal (start, end-exclusive) sub-ranges of the search never fully fetched for cache_key"""
+        begin = datetime.strptime(start_date, '%Y-%m-%d').toordinal()
+        end = datetime.strptime(end_date, '%Y-%m-%d').toordinal() + 1
+        
+        tree = self.event_cache.get(cache_key)
+        if not tree:
+            return [(begin, end)]
+        
+        # Cached spans are disjoint, so walking them in order leaves the gaps;
+        # partially fetched spans don't count as covered
+        partial = self._partial_ranges[cache_key]
+        gaps = []
+        cursor = begin
+        for interval in sorted(tree.overlap(begin, end), key=attrgetter('begin')):
+            if (interval.begin, interval.end) in partial:
+                continue
+            if interval.begin > cursor:
+                gaps.append((cursor, interval.begin))
+            cursor = max(cursor, interval.end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        
+        return gaps
     
-    def _cache_events(self, location: str, start_date: str, end_date: str, events: List[ResearchEvent]):
-        """Cache events for future searches"""
-        if location not in self.event_cache:
-            self.event_cache[location] = {}
-        
-        cache_key = f"{start_date}_{end_date}"
-        self.event_cache[location][cache_key] = events
-        
-        print(f"💾 Cached {len(events)} events for {location} ({start_date} to {end_date})")
-        
-        # Limit cache size per location (keep last 5 ranges)
-        if len(self.event_cache[location]) > 5:
-            # Remove oldest cache entry
-            oldest_key = next(iter(self.event_cache[location]))
-            del self.event_cache[location][oldest_key]
-            print(f"🗑️  Removed oldest cache: {oldest_key}")
+    def _cache_events(self, cache_key: CacheKey, start_date: str, end_date: str, events: List[ResearchEvent], complete: bool = True):
+        """
+        Cache events for future searches - one deduped entry per contiguous fetched span.
+        events must already be free of duplicates and of keys in the cache key's dedup index.
+        complete is False when the fetch stopped before running out of queries/results.
+        """
+        if cache_key not in self.event_cache:
+            self.event_cache[cache_key] = IntervalTree()
+            self._cache_order[cache_key] = OrderedDict()
+            self._dedup_index[cache_key] = set()
+            self._partial_ranges[cache_key] = set()
+            self._fetched_at[cache_key] = {}
+        
+        tree = self.event_cache[cache_key]
+        order = self._cache_order[cache_key]
+        index = self._dedup_index[cache_key]
+        partial = self._partial_ranges[cache_key]
+        fetched_at = self._fetched_at[cache_key]
+        
+        # Ordinal days, end-exclusive so a single-day range is non-empty
+        begin = datetime.strptime(start_date, '%Y-%m-%d').toordinal()
+        end = datetime.strptime(end_date, '%Y-%m-%d').toordinal() + 1
+        fetch_begin, fetch_end = begin, end
+        
+        # Merge with every overlapping or adjacent span into one canonical entry.
+        # Neighbours inside the fetched range were just re-fetched; ones reaching
+        # past it keep their own completeness and age
+        merged_events = []
+        span_fetched_at = time.monotonic()
+        for neighbour in sorted(tree.overlap(begin - 1, end + 1), key=attrgetter('begin')):
+            neighbour_range = (neighbour.begin, neighbour.end)
+            neighbour_fetched_at = fetched_at.pop(neighbour_range)
+            if neighbour.begin < fetch_begin or neighbour.end > fetch_end:
+                span_fetched_at = min(span_fetched_at, neighbour_fetched_at)
+                if neighbour_range in partial:
+                    complete = False
+            partial.discard(neighbour_range)
+            begin = min(begin, neighbour.begin)
+            end = max(end, neighbour.end)
+            merged_events.extend(neighbour.data)
+            tree.remove(neighbour)
+            del order[neighbour_range]
+        merged_events.extend(events)
+        index.update(event._dedup_key for event in events)
+        
+        cache_range = (begin, end)
+        interval = Interval(begin, end, merged_events)
+        tree.add(interval)
+        order[cache_range] = interval
+        fetched_at[cache_range] = span_fetched_at
+        if not complete:
+            partial.add(cache_range)
+        
+        logger.info("💾 Cached %s events for %s [%s] (%s to %s), span %s holds %s",
+                    len(events), *cache_key, start_date, end_date, self._format_range(cache_range), len(merged_events))
+        
+        # Limit cache size per location/category (keep CACHE_MAX_RANGES ranges)
+        if len(order) > CACHE_MAX_RANGES:
+            evicted_range = self._eviction_candidate(order)
+            self._drop_span(cache_key, evicted_range)
+            logger.info("🗑️  Evicted cache: %s", self._format_range(evicted_range))
+    
+    def _expire_stale_spans(self, cache_key: CacheKey):
+        """Drop spans fetched more than CACHE_SPAN_TTL_SECONDS ago so they read as gaps"""
+        fetched_at = self._fetched_at.get(cache_key)
+        if not fetched_at:
+            return
+        
+        cutoff = time.monotonic() - CACHE_SPAN_TTL_SECONDS
+        for cache_range in [r for r, fetched in fetched_at.items() if fetched <= cutoff]:
+            self._drop_span(cache_key, cache_range)
+            logger.info("⌛ Expired cache: %s [%s] %s", *cache_key, self._format_range(cache_range))
+    
+    def _drop_span(self, cache_key: CacheKey, cache_range: Tuple[int, int]):
+        """Remove one cached span and its events from every index"""
+        interval = self._cache_order[cache_key].pop(cache_range)
+        self.event_cache[cache_key].remove(interval)
+        self._partial_ranges[cache_key].discard(cache_range)
+        del self._fetched_at[cache_key][cache_range]
+        self._dedup_index[cache_key].difference_update(event._dedup_key for event in interval.data)
     
-    def _get_new_events_serpapi(self, location: str, start_date: str, end_date: str, category: str, max_results: int) -> List[ResearchEvent]:
-        """Get new events from SerpAPI with better queries"""
+    def _eviction_candidate(self, order: OrderedDict) -> Tuple[int, int]:
+        """Least valuable cached range: LRU position plus event-count/day-span weighting"""
+        if not CACHE_EVICT_ALPHA and not CACHE_EVICT_BETA:
+            return next(iter(order))  # Pure LRU
+        
+        # The newest entry (just inserted) is never the victim
+        candidates = list(order.items())[:-1]
+        max_events = max(len(interval.data) for _, interval in candidates) or 1
+        max_span = max(interval.end - interval.begin for _, interval in candidates)
+        
+        def value(item):
+            rank, (_, interval) = item
+            return (rank / len(candidates)
+                    + CACHE_EVICT_ALPHA * len(interval.data) / max_events
+                    - CACHE_EVICT_BETA * (interval.end - interval.begin) / max_span)
+        
+        # min() keeps the first (least recently used) entry on ties
+        _, (cache_range, _) = min(enumerate(candidates), key=value)
+        return cache_range
+    
+    def _format_range(self, cache_range: Tuple[int, int]) -> str:
+        """Readable form of an ordinal (start, end-exclusive) cache range"""
+        start = datetime.fromordinal(cache_range[0]).strftime('%Y-%m-%d')
+        end = datetime.fromordinal(cache_range[1] - 1).strftime('%Y-%m-%d')
+        return f"{start}_{end}"
+    
+    def _get_new_events_serpapi(self, location: str, start_date: str, end_date: str, category: str, max_results: int) -> Tuple[List[ResearchEvent], bool]:
+        """
+        Get new events from SerpAPI with better queries - queries run concurrently.
+        Returns (events, complete): every deduped event fetched (callers trim to their
+        limit) and whether the fetch ran to completion - no failed call, no early stop,
+        and either every query was sent or fewer events came back than were asked for.
+        """
         try:
-            print(f"🔄 SERPAPI: Getting {max_results} new events for {location}")
+            logger.info("🔄 SERPAPI: Getting %s new events for %s", max_results, location)
             
-            queries = self._build_optimized_queries(location, start_date, end_date, category)
-            all_events = []
+            # Only the queries we can use are ever formatted
+            query_iter = self._build_optimized_queries(location, start_date, end_date, category)
+            queries = list(islice(query_iter, max_results))
+            if not queries:
+                return [], True
+            queries_exhausted = next(query_iter, None) is None
             
-            for i, query in enumerate(queries[:max_results]):
-                try:
-                    print(f"📡 SerpAPI Call {i+1}: '{query}'")
-                    
-                    params = {
-                        "q": query, 
-                        "location": location, 
-                        "hl": "en", 
-                        "api_key": self.serp_api_key,
-                        "engine": "google_events"
-                    }
-                    
-                    response = requests.get("https://serpapi.com/search", params=params, timeout=15)
-                    
-                    if response.status_code != 200:
-                        print(f"❌ HTTP {response.status_code} for: {query}")
+            results = {}
+            found = set()  # dedup keys, so repeated events don't trigger the early exit
+            failed = stopped_early = False
+            executor = ThreadPoolExecutor(max_workers=min(SERPAPI_MAX_WORKERS, len(queries)))
+            try:
+                futures = {
+                    executor.submit(self._query_serpapi, i, query, location, start_date, end_date): i
+                    for i, query in enumerate(queries)
+                }
+                
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        logger.warning("❌ SerpAPI call %s failed: %s", i + 1, e)
+                        failed = True
                         continue
-                        
-                    data = response.json()
-                    
-                    # DEBUG: Print what we got from SerpAPI
-                    self._debug_serpapi_response(data, query)
-                    
-                    # Extract events from API response
-                    extracted_events = self._extract_events_from_serpapi(data, location, start_date, end_date)
                     
-                    if extracted_events:
-                        all_events.extend(extracted_events)
-                        print(f"✅ Found {len(extracted_events)} events from: {query}")
-                    else:
-                        print(f"ℹ️ No events extracted from: {query}")
-                        
-                    # Stop if we have enough events
-                    if len(all_events) >= max_results * 2:
+                    # Stop if we have enough events - queued queries are never sent
+                    found.update(f"{event['name'].lower().strip()}|{event['date']}" for event in results[i])
+                    if len(found) >= max_results * 2:
+                        stopped_early = len(results) < len(queries)
                         break
-                        
-                except Exception as e:
-                    print(f"❌ SerpAPI call {i+1} failed: {e}")
-                    continue
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            # Keep query order so results don't depend on response timing
+            all_events = [event for i in sorted(results) for event in results[i]]
             
             # Convert to ResearchEvent format
             research_events = self._convert_to_research_events(all_events, location)
-            final_events = research_events[:max_results]
+            final_events = self._remove_duplicates(research_events)
+            complete = not failed and not stopped_early and (queries_exhausted or len(final_events) < max_results)
             
-            print(f"🔄 SERPAPI FINAL: Got {len(final_events)} events from {len(queries)} queries")
-            return final_events
+            logger.info("🔄 SERPAPI FINAL: Got %s events from %s queries (%s)",
+                        len(final_events), len(results), "complete" if complete else "partial")
+            return final_events, complete
             
         except Exception as e:
-            print(f"❌ SerpAPI new events error: {e}")
-            return []
+            logger.error("❌ SerpAPI new events error: %s", e)
+            return [], False
+    
+    def _query_serpapi(self, i: int, query: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+        """Run one SerpAPI query over the shared session and extract its events"""
+        logger.debug("📡 SerpAPI Call %s: '%s'", i + 1, query)
+        
+        params = {
+            "q": query, 
+            "location": location, 
+            "hl": "en", 
+            "api_key": self.serp_api_key,
+            "engine": "google_events"
+        }
+        
+        response = self._session.get(SERPAPI_URL, params=params, timeout=15)
+        
+        if response.status_code != 200:
+            # Raised so the fetch counts as incomplete instead of "no events here"
+            raise RuntimeError(f"HTTP {response.status_code} for: {query}")
+            
+        # orjson parses the raw bytes directly - no intermediate str decode
+        data = orjson.loads(response.content)
+        
+        # DEBUG: Log what we got from SerpAPI
+        if logger.isEnabledFor(logging.DEBUG):
+            self._debug_serpapi_response(data, query)
+        
+        # Extract events from API response
+        extracted_events = self._extract_events_from_serpapi(data, location, start_date, end_date)
+        
+        if extracted_events:
+            logger.debug("✅ Found %s events from: %s", len(extracted_events), query)
+        else:
+            logger.debug("ℹ️ No events extracted from: %s", query)
+        
+        return extracted_events
     
-    def _build_optimized_queries(self, location: str, start_date: str, end_date: str, category: str) -> List[str]:
-        """Build BETTER SerpAPI queries that actually work"""
+    def _build_optimized_queries(self, location: str, start_date: str, end_date: str, category: str) -> Iterator[str]:
+        """Build BETTER SerpAPI queries that actually work - yielded lazily, best first"""
         
         # Convert dates to readable format
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         
         # Get month names for better queries
         start_month = start_dt.strftime('%B %Y')
-        end_month = end_dt.strftime('%B %Y')
-        
-        base_queries = [
-            # Natural language queries that work better
-            f"events in {location}",
-            f"upcoming events {location}",
-            f"things to do in {location}",
-            f"{location} events {start_month}",
-            f"concerts in {location}",
-            f"festivals {location}",
-            f"shows in {location}",
-            f"entertainment {location}",
-            f"nightlife {location}",
-            f"cultural events {location}",
-        ]
+        
+        # Natural language queries that work better
+        yield f"events in {location}"
+        yield f"upcoming events {location}"
+        yield f"things to do in {location}"
+        yield f"{location} events {start_month}"
+        yield f"concerts in {location}"
+        yield f"festivals {location}"
+        yield f"shows in {location}"
+        yield f"entertainment {location}"
+        yield f"nightlife {location}"
+        yield f"cultural events {location}"
         
         # Add category-specific queries
         if category == "music" or category == "all":
-            base_queries.extend([
-                f"concerts {location} {start_month}",
-                f"music events {location}",
-                f"live music {location}",
-            ])
+            yield f"concerts {location} {start_month}"
+            yield f"music events {location}"
+            yield f"live music {location}"
         
         if category == "sports" or category == "all":
-            base_queries.extend([
-                f"sports events {location}",
-                f"games {location} {start_month}",
-            ])
+            yield f"sports events {location}"
+            yield f"games {location} {start_month}"
             
         if category == "food" or category == "all":
-            base_queries.extend([
-                f"food festivals {location}",
-                f"culinary events {location}",
-            ])
-        
-        return base_queries
+            yield f"food festivals {location}"
+            yield f"culinary events {location}"
     
     def _debug_serpapi_response(self, data: Dict, query: str):
         """Debug what SerpAPI returned"""
-        print(f"🔍 DEBUG for '{query}':")
+        logger.debug("🔍 DEBUG for '%s':", query)
         
         if 'error' in data:
-            print(f"   ❌ SerpAPI Error: {data['error']}")
+            logger.debug("   ❌ SerpAPI Error: %s", data['error'])
             return
             
         if 'events_results' in data:
             events_count = len(data['events_results'])
-            print(f"   ✅ events_results: {events_count} events")
+            logger.debug("   ✅ events_results: %s events", events_count)
             
             # Show first few event titles if available
             for i, event in enumerate(data['events_results'][:3]):
                 title = event.get('title', 'No title')
                 date = event.get('date', 'No date')
-                print(f"   📅 Event {i+1}: '{title}' - {date}")
+                logger.debug("   📅 Event %s: '%s' - %s", i + 1, title, date)
         else:
-            print(f"   ℹ️ No 'events_results' in response")
+            logger.debug("   ℹ️ No 'events_results' in response")
             
         # Check for other result types
         if 'organic_results' in data:
-            print(f"   🔍 organic_results: {len(data['organic_results'])} results")
-        
-        print("")  # Empty line for readability
+            logger.debug("   🔍 organic_results: %s results", len(data['organic_results']))
+
     
     def _extract_events_from_serpapi(self, data: Dict, location: str, start_date: str, end_date: str) -> List[Dict]:
         """Extract events from SerpAPI response with better parsing"""
@@ -259,6 +532,9 @@ class SmartEventEngine:
         if 'events_results' not in data or not data['events_results']:
             return events
         
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        
         for event in data['events_results']:
             try:
                 title = event.get('title', '').strip()
@@ -281,9 +557,6 @@ class SmartEventEngine:
                 formatted_date = event_date.strftime('%Y-%m-%d')
                 
                 # Check if event is within our date range
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-                
                 if start_dt <= event_date <= end_dt:
                     events.append({
                         'name': title,
@@ -295,7 +568,7 @@ class SmartEventEngine:
                     })
                     
             except Exception as e:
-                print(f"   ⚠️ Failed to parse event: {e}")
+                logger.debug("   ⚠️ Failed to parse event: %s", e)
                 continue
         
         return events
@@ -316,17 +589,7 @@ class SmartEventEngine:
                 date_str = date_str.split(' - ')[0].strip()
             
             # Try different date formats
-            date_formats = [
-                '%Y-%m-%d',
-                '%b %d, %Y',
-                '%B %d, %Y', 
-                '%d %b %Y',
-                '%d %B %Y',
-                '%m/%d/%Y',
-                '%d/%m/%Y'
-            ]
-            
-            for fmt in date_formats:
+            for fmt in _DATE_FORMATS:
                 try:
                     return datetime.strptime(date_str, fmt)
                 except:
@@ -344,14 +607,8 @@ class SmartEventEngine:
             
         try:
             # Look for common date patterns in description
-            date_patterns = [
-                r'(\d{4}-\d{2}-\d{2})',
-                r'(\d{1,2}/\d{1,2}/\d{4})',
-                r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})',
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, description)
+            for pattern in _DATE_PATTERNS:
+                match = pattern.search(description)
                 if match:
                     return self._parse_event_date(match.group(1))
                     
@@ -363,27 +620,10 @@ class SmartEventEngine:
         """Classify event type based on content"""
         if not text:
             return 'other'
-            
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['concert', 'music', 'dj', 'band', 'live music']): 
-            return 'music'
-        if any(word in text_lower for word in ['conference', 'summit', 'workshop', 'business', 'tech']): 
-            return 'conference'
-        if any(word in text_lower for word in ['festival', 'cultural', 'celebration']): 
-            return 'festival'
-        if any(word in text_lower for word in ['sports', 'game', 'match', 'tournament', 'race']): 
-            return 'sports'
-        if any(word in text_lower for word in ['art', 'theater', 'exhibition', 'gallery', 'museum']): 
-            return 'arts'
-        if any(word in text_lower for word in ['food', 'drink', 'culinary', 'wine', 'beer']): 
-            return 'food'
-        if any(word in text_lower for word in ['family', 'kids', 'children']): 
-            return 'family'
-        if any(word in text_lower for word in ['comedy', 'standup', 'improv']): 
-            return 'comedy'
-        
-        return 'other'
+        
+        # One automaton pass finds every keyword; the highest-priority category wins
+        matches = _EVENT_TYPE_AUTOMATON.iter(text.lower())
+        return min((match for _, match in matches), default=(0, 'other'))[1]
     
     def _remove_duplicates(self, events: List[ResearchEvent]) -> List[ResearchEvent]:
         """Remove duplicate events based on name and date"""
@@ -391,9 +631,8 @@ class SmartEventEngine:
         unique = []
         
         for event in events:
-            identifier = (event.event_name.lower().strip(), event.exact_date)
-            if identifier not in seen:
-                seen.add(identifier)
+            if event._dedup_key not in seen:
+                seen.add(event._dedup_key)
                 unique.append(event)
         
         return unique
@@ -419,15 +658,18 @@ class SmartEventEngine:
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics for debugging"""
-        stats = {
-            'total_locations': len(self.event_cache),
-            'locations': {}
-        }
-        
-        for location, ranges in self.event_cache.items():
-            stats['locations'][location] = {
-                'cached_ranges': len(ranges),
-                'total_events': sum(len(events) for events in ranges.values())
+        with self._lock:
+            stats = {
+                'total_locations': len({location for location, _ in self.event_cache}),
+                'locations': {}
             }
+            
+            # location -> category -> span counts
+            for (location, category), tree in self.event_cache.items():
+                stats['locations'].setdefault(location, {})[category] = {
+                    'cached_ranges': len(tree),
+                    'partial_ranges': len(self._partial_ranges.get((location, category), ())),
+                    'total_events': sum(len(interval.data) for interval in tree)
+                }
         
         return stats
\ No newline at end of file
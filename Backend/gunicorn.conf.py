@@ -0,0 +1,17 @@
+"""
+Gunicorn settings for production
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+import multiprocessing
+
+bind = "0.0.0.0:8000"
+
+# One process per CPU so tweet post-processing is not bound to a single GIL
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Quiet per-request INFO logging in production; workers inherit LOG_LEVEL
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+loglevel = os.environ["LOG_LEVEL"].lower()
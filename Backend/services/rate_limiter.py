@@ -3,122 +3,165 @@ Advanced Rate Limiter for Twitter API
 """
 
 import time
+import heapq
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Optional
 import threading
 
 class TwitterRateLimiter:
     def __init__(self):
         self.rate_limits = {}
-        self.lock = threading.Lock()
         self.setup_default_limits()
+        # One lock per endpoint so search and user lookups never contend
+        self._locks = {endpoint: threading.Lock() for endpoint in self.rate_limits}
     
     def setup_default_limits(self):
         """Setup default rate limits for Twitter API v2"""
-        self.rate_limits['search_recent'] = {
-            'limit': 450,
-            'remaining': 450,
-            'reset_time': None,
-            'window_minutes': 15
-        }
-        
-        self.rate_limits['users'] = {
-            'limit': 300,
-            'remaining': 300,
-            'reset_time': None,
-            'window_minutes': 15
+        self.rate_limits['search_recent'] = self._new_bucket(limit=450, window_minutes=15)
+        self.rate_limits['users'] = self._new_bucket(limit=300, window_minutes=15)
+    
+    @staticmethod
+    def _new_bucket(limit: int, window_minutes: int) -> Dict:
+        """Token bucket holding up to limit tokens, refilled evenly over the window"""
+        return {
+            'limit': limit,
+            'tokens': float(limit),
+            'rate': limit / (window_minutes * 60),  # tokens per second
+            'last_refill': time.monotonic(),
+            'reset_time': None,  # server-reported reset; refill is paused until then
+            'window_minutes': window_minutes
         }
     
+    @staticmethod
+    def _refill(limit_info: Dict, now: float):
+        """Top the bucket up for the time elapsed since the last refill"""
+        if limit_info['reset_time']:
+            if now < limit_info['reset_time']:
+                return  # Server quota is authoritative until its window resets
+            limit_info['tokens'] = float(limit_info['limit'])
+            limit_info['reset_time'] = None
+        else:
+            elapsed = now - limit_info['last_refill']
+            limit_info['tokens'] = min(limit_info['limit'], limit_info['tokens'] + elapsed * limit_info['rate'])
+        limit_info['last_refill'] = now
+    
     def check_rate_limit(self, endpoint: str) -> bool:
         """Check if we can make a request to the endpoint"""
-        with self.lock:
-            if endpoint not in self.rate_limits:
-                return True
-            
+        if endpoint not in self.rate_limits:
+            return True
+        
+        with self._locks[endpoint]:
             limit_info = self.rate_limits[endpoint]
+            self._refill(limit_info, time.monotonic())
             
-            if limit_info['reset_time'] and datetime.now() > limit_info['reset_time']:
-                limit_info['remaining'] = limit_info['limit']
-                limit_info['reset_time'] = None
-            
-            if limit_info['remaining'] > 0:
-                limit_info['remaining'] -= 1
+            if limit_info['tokens'] >= 1:
+                limit_info['tokens'] -= 1
                 return True
-            else:
-                if not limit_info['reset_time']:
-                    limit_info['reset_time'] = datetime.now() + timedelta(minutes=limit_info['window_minutes'])
-                return False
+            return False
     
     def update_from_headers(self, endpoint: str, headers: Dict):
         """Update rate limits from API response headers"""
-        with self.lock:
-            if endpoint not in self.rate_limits:
-                return
-            
+        if endpoint not in self.rate_limits:
+            return
+        
+        with self._locks[endpoint]:
             limit_info = self.rate_limits[endpoint]
             
             if 'x-rate-limit-limit' in headers:
                 limit_info['limit'] = int(headers['x-rate-limit-limit'])
+                limit_info['rate'] = limit_info['limit'] / (limit_info['window_minutes'] * 60)
             
             if 'x-rate-limit-remaining' in headers:
-                limit_info['remaining'] = int(headers['x-rate-limit-remaining'])
+                limit_info['tokens'] = float(min(int(headers['x-rate-limit-remaining']), limit_info['limit']))
+                limit_info['last_refill'] = time.monotonic()
             
             if 'x-rate-limit-reset' in headers:
+                # Header is a wall-clock epoch; store it on the monotonic timeline
                 reset_timestamp = int(headers['x-rate-limit-reset'])
-                limit_info['reset_time'] = datetime.fromtimestamp(reset_timestamp)
+                limit_info['reset_time'] = reset_timestamp - time.time() + time.monotonic()
     
     def get_wait_time(self, endpoint: str) -> float:
         """Get recommended wait time if rate limited"""
-        with self.lock:
-            if endpoint not in self.rate_limits:
-                return 0
-            
+        if endpoint not in self.rate_limits:
+            return 0
+        
+        with self._locks[endpoint]:
             limit_info = self.rate_limits[endpoint]
+            now = time.monotonic()
+            self._refill(limit_info, now)
             
+            if limit_info['tokens'] >= 1:
+                return 0
             if limit_info['reset_time']:
-                wait_seconds = (limit_info['reset_time'] - datetime.now()).total_seconds()
-                return max(wait_seconds, 0)
+                return max(limit_info['reset_time'] - now, 0)
             
-            return 60
+            # Time until the next whole token drips in
+            return (1 - limit_info['tokens']) / limit_info['rate']
     
     def get_status(self) -> Dict:
         """Get current rate limit status"""
         status = {}
         for endpoint, info in self.rate_limits.items():
             status[endpoint] = {
-                'remaining': info['remaining'],
+                'remaining': int(info['tokens']),
                 'limit': info['limit'],
-                'reset_time': info['reset_time'].isoformat() if info['reset_time'] else None
+                'reset_time': self._to_iso(info['reset_time'])
             }
         return status
 
+    @staticmethod
+    def _to_iso(reset_time: Optional[float]) -> Optional[str]:
+        """Convert a monotonic reset moment back to a wall-clock ISO timestamp"""
+        if not reset_time:
+            return None
+        return datetime.fromtimestamp(reset_time - time.monotonic() + time.time()).isoformat()
+
 class APICache:
+    STRIPES = 16
+
     def __init__(self, ttl_minutes: int = 30):
-        self.cache = {}
         self.ttl = ttl_minutes * 60
-        self.lock = threading.Lock()
+        # Stripe-locked dict: keys hash onto independent (lock, dict, heap) shards so
+        # concurrent lookups for different queries don't serialize on one lock.
+        # Each heap holds (expiry, key) so expiry pops only what is actually stale.
+        self._stripes = [(threading.Lock(), {}, []) for _ in range(self.STRIPES)]
+    
+    def _stripe(self, key: str):
+        return self._stripes[hash(key) % self.STRIPES]
+    
+    def _prune(self, cache: Dict, heap: list, now: float):
+        """Pop expired heap entries; skip tombstones left by keys that were re-set"""
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            entry = cache.get(key)
+            if entry is not None and entry[1] + self.ttl == expiry:
+                del cache[key]
     
     def get(self, key: str):
         """Get cached value"""
-        with self.lock:
-            if key in self.cache:
-                data, timestamp = self.cache[key]
+        lock, cache, _ = self._stripe(key)
+        with lock:
+            if key in cache:
+                data, timestamp = cache[key]
                 if time.time() - timestamp < self.ttl:
                     return data
                 else:
-                    del self.cache[key]
+                    del cache[key]
             return None
     
     def set(self, key: str, value):
         """Set cached value"""
-        with self.lock:
-            self.cache[key] = (value, time.time())
+        lock, cache, heap = self._stripe(key)
+        with lock:
+            now = time.time()
+            self._prune(cache, heap, now)
+            cache[key] = (value, now)
+            heapq.heappush(heap, (now + self.ttl, key))
     
     def clear_expired(self):
         """Clear expired cache entries"""
-        with self.lock:
-            current_time = time.time()
-            expired_keys = [k for k, (_, ts) in self.cache.items() if current_time - ts >= self.ttl]
-            for key in expired_keys:
-                del self.cache[key]
\ No newline at end of file
+        current_time = time.time()
+        for lock, cache, heap in self._stripes:
+            with lock:
+                self._prune(cache, heap, current_time)
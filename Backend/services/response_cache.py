@@ -0,0 +1,232 @@
+"""
+Response Cache for API endpoints
+Redis-backed when REDIS_URL is set, in-memory fallback otherwise
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import secrets
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional - fall back to in-memory cache
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Lock scripts compare the holder's token so a worker never touches a lock it lost
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_EXTEND_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+class ResponseCache:
+    # The holder re-extends the lock every LOCK_TTL_SECONDS / 3 while computing,
+    # so the TTL only bounds how long a crashed holder blocks other workers
+    LOCK_TTL_SECONDS = 30
+    LOCK_POLL_SECONDS = 0.1
+    # Worst-case compute: 15 SerpAPI queries on 4 threads at a 15 s timeout (~60 s),
+    # or Twitter retries plus rate-limit sleeps - waiters give up after this long
+    LOCK_WAIT_SECONDS = 120
+    MEMORY_MAX_ENTRIES = 10_000
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis = None
+        self.memory: Dict[str, Tuple[bytes, float]] = {}
+        # (expires_at, key) min-heap so expired/soonest-expiring entries are dropped
+        # without scanning; stale pairs left by re-set keys are skipped lazily
+        self._memory_expiry: List[Tuple[float, str]] = []
+        # Per-process in-flight computes: identical concurrent requests share one
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        if redis_url and aioredis is not None:
+            self.redis = aioredis.from_url(redis_url)
+            self._release_script = self.redis.register_script(_RELEASE_LOCK_LUA)
+            self._extend_script = self.redis.register_script(_EXTEND_LOCK_LUA)
+        elif redis_url:
+            logger.warning("redis package not installed - using in-memory response cache")
+
+    @staticmethod
+    def make_key(prefix: str, payload: Dict) -> str:
+        """Stable cache key from a request's normalized JSON"""
+        normalized = json.dumps(payload, sort_keys=True)
+        return f"{prefix}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached value"""
+        if self.redis is not None:
+            try:
+                return await self.redis.get(key)
+            except Exception as e:
+                logger.warning("Redis get failed: %s", e)
+                return None
+
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self.memory[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        """Set cached value with TTL in seconds"""
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, ttl, value)
+            except Exception as e:
+                logger.warning("Redis set failed: %s", e)
+            return
+
+        now = time.monotonic()
+        self._prune_memory(now)
+        expires_at = now + ttl
+        self.memory[key] = (value, expires_at)
+        heapq.heappush(self._memory_expiry, (expires_at, key))
+        
+        # Keys come from user input - cap the fallback, dropping soonest-expiring first
+        while len(self.memory) > self.MEMORY_MAX_ENTRIES:
+            self._pop_expiry()
+        
+        # Re-set keys leave stale heap pairs behind - rebuild once they dominate
+        if len(self._memory_expiry) > 2 * self.MEMORY_MAX_ENTRIES:
+            self._memory_expiry = [(expires, k) for k, (_, expires) in self.memory.items()]
+            heapq.heapify(self._memory_expiry)
+    
+    def _pop_expiry(self):
+        """Drop the soonest-expiring memory entry (skipping stale heap pairs)"""
+        expires_at, key = heapq.heappop(self._memory_expiry)
+        entry = self.memory.get(key)
+        if entry is not None and entry[1] == expires_at:
+            del self.memory[key]
+    
+    def _prune_memory(self, now: float):
+        """Remove every expired memory entry"""
+        while self._memory_expiry and self._memory_expiry[0][0] <= now:
+            self._pop_expiry()
+
+    async def acquire_lock(self, key: str) -> Optional[str]:
+        """
+        SET NX PX lock:<key> to a random token so only one worker computes a
+        missing entry. Returns the token (empty when unguarded) or None if held.
+        """
+        if self.redis is None:
+            return ""  # Single process - in-flight futures already coalesce callers
+        
+        token = secrets.token_hex(16)
+        try:
+            acquired = await self.redis.set(f"lock:{key}", token, nx=True, px=int(self.LOCK_TTL_SECONDS * 1000))
+        except Exception as e:
+            logger.warning("Redis lock failed: %s", e)
+            return ""  # Redis down - compute without the guard
+        return token if acquired else None
+    
+    async def release_lock(self, key: str, token: str):
+        """Delete lock:<key> only if it still holds our token"""
+        if self.redis is None or not token:
+            return
+        
+        try:
+            await self._release_script(keys=[f"lock:{key}"], args=[token])
+        except Exception as e:
+            logger.warning("Redis unlock failed: %s", e)
+    
+    async def _keep_lock(self, key: str, token: str):
+        """Extend lock:<key> while the holder computes - runs until cancelled"""
+        while True:
+            await asyncio.sleep(self.LOCK_TTL_SECONDS / 3)
+            try:
+                extended = await self._extend_script(keys=[f"lock:{key}"], args=[token, int(self.LOCK_TTL_SECONDS * 1000)])
+            except Exception as e:
+                logger.warning("Redis lock extend failed: %s", e)
+                continue
+            if not extended:
+                logger.warning("Stampede lock for %s was lost", key)
+                return
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Tuple[bytes, bool]]], ttl: int) -> bytes:
+        """
+        Return the cached JSON body for key, or compute it once and cache it.
+        compute() returns (body, cacheable). Concurrent callers in this process
+        share the one in-flight compute() and get its body whether or not it was
+        cacheable; the Redis lock makes other workers wait for the holder's entry.
+        The body is kept as encoded bytes so hits skip JSON encoding entirely.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: a waiter being cancelled must not cancel the shared lookup
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await self._compute_across_workers(key, compute, ttl)
+        except asyncio.CancelledError:
+            # Only the owner is cancelled - waiters get an ordinary error
+            self._fail_shared(future, RuntimeError("Shared lookup was cancelled"))
+            raise
+        except Exception as e:
+            self._fail_shared(future, e)
+            raise
+        else:
+            future.set_result(body)
+            return body
+        finally:
+            del self._inflight[key]
+    
+    @staticmethod
+    def _fail_shared(future: asyncio.Future, error: Exception):
+        """Fail an in-flight future without a 'never retrieved' warning if nobody waits"""
+        future.set_exception(error)
+        future.exception()
+    
+    async def _compute_across_workers(self, key: str, compute: Callable[[], Awaitable[Tuple[bytes, bool]]], ttl: int) -> bytes:
+        """Run compute() under the cross-worker lock, or reuse the entry another worker cached"""
+        token = await self.acquire_lock(key)
+        if token is None:
+            # Another worker is already calling the API for this key
+            deadline = time.monotonic() + self.LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.LOCK_POLL_SECONDS)
+                cached = await self.get(key)
+                if cached is not None:
+                    return cached
+                token = await self.acquire_lock(key)
+                if token is not None:
+                    break  # Holder finished without caching - compute ourselves
+        
+        keeper = asyncio.create_task(self._keep_lock(key, token)) if token else None
+        try:
+            body, cacheable = await compute()
+            if cacheable:
+                await self.set(key, body, ttl)
+            return body
+        finally:
+            if keeper is not None:
+                keeper.cancel()
+            if token:
+                await self.release_lock(key, token)
+    
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self.redis is not None:
+            await self.redis.aclose()
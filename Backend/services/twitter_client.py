@@ -3,14 +3,31 @@ Twitter Client with Proper Rate Limiting and Error Handling
 """
 
 import os
+import json
+import logging
+import hashlib
 import tweepy
 import time
 import random
+from functools import lru_cache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 from services.rate_limiter import TwitterRateLimiter, APICache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Connection pool size for the shared tweepy HTTP session (one per concurrent search thread)
+TWITTER_POOL_MAXSIZE = 16
+
+def _log_retry(retry_state):
+    """tenacity before_sleep hook: report the failed attempt and the backoff"""
+    error = retry_state.outcome.exception()
+    logger.warning("⚠️ API request failed (attempt %s): %s", retry_state.attempt_number, error)
+    logger.info("⏳ Waiting %.1f seconds before retry...", retry_state.next_action.sleep)
+
 class TwitterClient:
     def __init__(self):
         self.bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
@@ -34,83 +51,78 @@ class TwitterClient:
                 access_token_secret=self.access_secret,
                 wait_on_rate_limit=False  # We handle rate limiting ourselves
             )
-            print("✅ Twitter API client initialized")
+            # Keep TLS connections to api.twitter.com alive across concurrent searches
+            self.client.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=TWITTER_POOL_MAXSIZE))
+            logger.info("✅ Twitter API client initialized")
             return True
         except Exception as e:
-            print(f"❌ Twitter client setup failed: {e}")
+            logger.error("❌ Twitter client setup failed: %s", e)
             return False
     
+    @staticmethod
+    def _make_cache_key(args, kwargs) -> str:
+        """Stable key over the full request params (query, max_results, fields)"""
+        params = json.dumps({'args': args, 'kwargs': kwargs}, sort_keys=True, default=str)
+        return f"search:{hashlib.blake2b(params.encode(), digest_size=16).hexdigest()}"
+    
+    @retry(
+        stop=stop_after_attempt(2),  # Only 1 retry to avoid long waits
+        wait=wait_random_exponential(multiplier=2, max=10),  # SHORT backoff: max 10 seconds
+        retry=retry_if_not_exception_type(tweepy.BadRequest),  # Don't retry bad requests
+        before_sleep=_log_retry,
+        reraise=True
+    )
+    def _call(self, request_func, *args, **kwargs):
+        """Single API call; retried by tenacity on rate-limit and transient errors"""
+        return request_func(*args, **kwargs)
+    
     def make_request_with_retry(self, endpoint: str, request_func, *args, **kwargs):
         """
         Make API request with rate limiting and SHORT backoff
         """
-        max_retries = 1  # Only 1 retry to avoid long waits
-        base_delay = 2   # Short base delay
-        
-        for attempt in range(max_retries + 1):  # +1 for the initial attempt
-            # Check rate limit
-            if not self.rate_limiter.check_rate_limit(endpoint):
-                wait_time = self.rate_limiter.get_wait_time(endpoint)
-                print(f"⏳ Rate limit hit for {endpoint}. Waiting {wait_time:.1f} seconds...")
-                
-                # MAX WAIT: 15 seconds instead of 60
-                wait_time = min(wait_time, 15)
-                time.sleep(wait_time + random.uniform(0.1, 0.5))
+        # Check rate limit
+        if not self.rate_limiter.check_rate_limit(endpoint):
+            wait_time = self.rate_limiter.get_wait_time(endpoint)
+            logger.warning("⏳ Rate limit hit for %s. Waiting %.1f seconds...", endpoint, wait_time)
             
-            try:
-                # Check cache first for identical requests
-                cache_key = None
-                if endpoint == 'search_recent':
-                    query = kwargs.get('query') or (args[0] if args else None)
-                    if query:
-                        cache_key = f"search_{hash(query)}"
-                        cached = self.cache.get(cache_key)
-                        if cached:
-                            print(f"📦 Using cached results for: {query}")
-                            return cached
-                
-                # Make API request
-                print(f"🔍 Making API request to {endpoint} (attempt {attempt + 1})")
-                response = request_func(*args, **kwargs)
-                
-                # Update rate limits from response
-                if hasattr(response, 'headers'):
-                    self.rate_limiter.update_from_headers(endpoint, response.headers)
-                
-                # Cache successful responses
-                if cache_key and response:
-                    self.cache.set(cache_key, response)
-                
-                return response
-                
-            except tweepy.TooManyRequests as e:
-                print(f"⚠️ Rate limit exceeded (attempt {attempt + 1}): {e}")
-                
-                if attempt < max_retries:
-                    # SHORT backoff: max 10 seconds
-                    max_wait = 10
-                    sleep_time = min(base_delay * (2 ** attempt), max_wait) + random.uniform(0.1, 1.0)
-                    
-                    print(f"⏳ Waiting {sleep_time:.1f} seconds before retry...")
-                    time.sleep(sleep_time)
-                else:
-                    print("❌ Max retries reached for rate limit")
-                    return None
-                
-            except tweepy.BadRequest as e:
-                print(f"❌ Bad request error (attempt {attempt + 1}): {e}")
-                return None  # Don't retry bad requests
-                
-            except Exception as e:
-                print(f"❌ API request failed (attempt {attempt + 1}): {e}")
-                if attempt < max_retries:
-                    sleep_time = base_delay * (2 ** attempt) + random.uniform(0.1, 1.0)
-                    print(f"⏳ Waiting {sleep_time:.1f} seconds before retry...")
-                    time.sleep(sleep_time)
-                else:
-                    return None
+            # MAX WAIT: 15 seconds instead of 60
+            wait_time = min(wait_time, 15)
+            time.sleep(wait_time + random.uniform(0.1, 0.5))
+        
+        # Check cache first for identical requests
+        cache_key = None
+        if endpoint == 'search_recent':
+            query = kwargs.get('query') or (args[0] if args else None)
+            if query:
+                cache_key = self._make_cache_key(args, kwargs)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    logger.info("📦 Using cached results for: %s", query)
+                    return cached
+        
+        try:
+            # Make API request
+            logger.debug("🔍 Making API request to %s", endpoint)
+            response = self._call(request_func, *args, **kwargs)
+        except tweepy.BadRequest as e:
+            logger.error("❌ Bad request error: %s", e)
+            return None
+        except tweepy.TooManyRequests as e:
+            logger.warning("❌ Max retries reached for rate limit: %s", e)
+            return None
+        except Exception as e:
+            logger.error("❌ API request failed: %s", e)
+            return None
+        
+        # Update rate limits from response
+        if hasattr(response, 'headers'):
+            self.rate_limiter.update_from_headers(endpoint, response.headers)
         
-        return None
+        # Cache successful responses
+        if cache_key and response:
+            self.cache.set(cache_key, response)
+        
+        return response
     
     def search_recent_tweets_safe(self, query: str, max_results: int = 10, **kwargs):
         """Safe search with proper max_results handling"""
@@ -126,7 +138,7 @@ class TwitterClient:
                 **kwargs
             )
         except Exception as e:
-            print(f"❌ Search failed: {e}")
+            logger.error("❌ Search failed: %s", e)
             return None
     
     def get_rate_limit_status(self):
@@ -139,4 +151,9 @@ class TwitterClient:
     
     def is_operational(self):
         """Check if client is operational"""
-        return self.client is not None
\ No newline at end of file
+        return self.client is not None
+
+@lru_cache(maxsize=None)
+def get_twitter_client() -> TwitterClient:
+    """Process-wide TwitterClient so every caller shares one pooled HTTP session"""
+    return TwitterClient()
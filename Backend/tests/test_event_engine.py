@@ -0,0 +1,210 @@
+"""
+SmartEventEngine cache coverage - SerpAPI is mocked at _query_serpapi
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+import engines.event_engine as event_engine
+from engines.event_engine import SmartEventEngine
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_engine, 'SERPAPI_CACHE_PATH', str(tmp_path / 'serp_cache'))
+    return SmartEventEngine()
+
+def _event(name, date):
+    return {'name': name, 'date': date, 'venue': 'Dubai', 'description': '', 'link': '', 'category': 'other'}
+
+def _days(start_date, end_date):
+    day = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    while day <= end:
+        yield day.strftime('%Y-%m-%d')
+        day += timedelta(days=1)
+
+def _mock_serpapi(engine, monkeypatch, results):
+    """Replace the SerpAPI call with results(i, start_date, end_date); returns the call log"""
+    calls = []
+
+    def query(i, query, location, start_date, end_date):
+        calls.append((i, start_date, end_date))
+        return results(i, start_date, end_date)
+
+    monkeypatch.setattr(engine, '_query_serpapi', query)
+    return calls
+
+def test_cut_short_fetch_is_fetched_again(engine, monkeypatch):
+    # Every query finds a different event per day - far more than any request asks for
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [
+        _event(f"Event {i} {day}", day) for day in _days(start, end)
+    ])
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 3)) == 3
+    assert engine.get_cache_stats()['locations']['Dubai']['all']['partial_ranges'] == 1
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 20)) == 20
+    assert len(engine.discover_events('Dubai', '2025-01-10', '2025-01-20', [], 5)) == 5
+    assert calls
+
+def test_partial_span_is_refetched_when_cache_runs_short(engine, monkeypatch):
+    # Query i finds a single event, on day i+1
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [
+        _event(f"Event {i}", f"2025-01-{i + 1:02d}")
+    ])
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 3)) == 3
+    first_calls = len(calls)
+
+    events = engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 10)
+    assert len(calls) > first_calls
+    assert len(events) == 10
+    assert len({event.event_name for event in events}) == 10
+
+def test_complete_fetch_is_not_repeated(engine, monkeypatch):
+    # Every query returns the same two events - the span is exhausted
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [
+        _event("Dubai Jazz Night", "2025-01-05"),
+        _event("Dubai Food Fair", "2025-01-12"),
+    ])
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 2
+    assert engine.get_cache_stats()['locations']['Dubai']['all']['partial_ranges'] == 0
+    first_calls = len(calls)
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 20)) == 2
+    assert len(engine.discover_events('Dubai', '2025-01-10', '2025-01-20', [], 5)) == 1
+    assert len(calls) == first_calls
+
+def test_empty_complete_fetch_is_recorded(engine, monkeypatch):
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [])
+
+    assert engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5) == []
+    first_calls = len(calls)
+    assert first_calls
+    assert engine.get_cache_stats()['locations']['Dubai']['all'] == {
+        'cached_ranges': 1, 'partial_ranges': 0, 'total_events': 0
+    }
+
+    assert engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5) == []
+    assert len(calls) == first_calls
+
+def test_refetch_with_nothing_new_clears_partial(engine, monkeypatch):
+    # Every query returns the same three events
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [
+        _event("Dubai Jazz Night", "2025-01-05"),
+        _event("Dubai Food Fair", "2025-01-12"),
+        _event("Dubai Marathon", "2025-01-19"),
+    ])
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 3)) == 3
+    assert engine.get_cache_stats()['locations']['Dubai']['all']['partial_ranges'] == 1
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 3
+    assert engine.get_cache_stats()['locations']['Dubai']['all']['partial_ranges'] == 0
+    second_calls = len(calls)
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 3
+    assert len(calls) == second_calls
+
+def test_spans_are_refetched_after_ttl(engine, monkeypatch):
+    events = [_event("Dubai Jazz Night", "2025-01-05")]
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: list(events))
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 1
+    first_calls = len(calls)
+
+    # A newly announced event shows up once the span has expired
+    events.append(_event("Dubai Food Fair", "2025-01-12"))
+    monkeypatch.setattr(event_engine, 'CACHE_SPAN_TTL_SECONDS', 0)
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 2
+    assert len(calls) > first_calls
+
+def test_failed_query_leaves_span_partial(engine, monkeypatch):
+    def results(i, start, end):
+        if i == 1:
+            raise RuntimeError("HTTP 429")
+        return [_event("Dubai Jazz Night", "2025-01-05")]
+
+    calls = _mock_serpapi(engine, monkeypatch, results)
+
+    assert len(engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)) == 1
+    first_calls = len(calls)
+
+    engine.discover_events('Dubai', '2025-01-01', '2025-01-31', [], 5)
+    assert len(calls) > first_calls
+
+def test_coverage_is_per_category(engine, monkeypatch):
+    # Music and sports fan out to different queries, so they find different events
+    calls = []
+
+    def query(i, query, location, start_date, end_date):
+        calls.append(query)
+        if 'sports' in query or 'games' in query:
+            return [_event("Dubai Marathon", "2025-01-12")]
+        return [_event("Jazz", "2025-01-05")]
+
+    monkeypatch.setattr(engine, '_query_serpapi', query)
+
+    music = engine.discover_events('Dubai', '2025-01-01', '2025-01-31', ['music'], 20)
+    assert [event.event_name for event in music] == ["Jazz"]
+    music_calls = len(calls)
+
+    sports = engine.discover_events('Dubai', '2025-01-01', '2025-01-31', ['sports'], 20)
+    assert len(calls) > music_calls
+    assert "Dubai Marathon" in [event.event_name for event in sports]
+
+def _track_concurrency(target, name, counters):
+    """Wrap target.name so counters[name] records its peak concurrent callers"""
+    original = getattr(target, name)
+    active = [0]
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        with lock:
+            active[0] += 1
+            counters[name] = max(counters.get(name, 0), active[0])
+        try:
+            time.sleep(0.002)  # Widen the window so overlapping callers collide
+            return original(*args, **kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    return wrapper
+
+def test_concurrent_requests_keep_cache_consistent(engine, monkeypatch, caplog):
+    calls = _mock_serpapi(engine, monkeypatch, lambda i, start, end: [
+        _event(f"Event {i} {day}", day) for day in _days(start, end)
+    ])
+
+    # Cache bookkeeping must be serialized; SerpAPI calls must not be
+    cache_methods = ('_get_cached_events', '_uncovered_ranges', '_cache_events')
+    peaks = {}
+    for name in cache_methods + ('_query_serpapi',):
+        monkeypatch.setattr(engine, name, _track_concurrency(engine, name, peaks))
+
+    def request(n):
+        start = datetime(2025, 1, 1) + timedelta(days=3 * (n % 16))
+        end = start + timedelta(days=5)
+        return engine.discover_events('Dubai', start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), [], 5)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(request, range(64)))
+
+    assert not [record for record in caplog.records if record.levelname == 'ERROR']
+    assert all(len(events) == 5 for events in results)
+    assert calls
+    assert all(peaks[name] == 1 for name in cache_methods)
+    assert peaks['_query_serpapi'] > 1
+
+    key = ('Dubai', 'all')
+    tree = engine.event_cache[key]
+    assert set(engine._cache_order[key]) == {(interval.begin, interval.end) for interval in tree}
+    assert engine._dedup_index[key] == {event._dedup_key for interval in tree for event in interval.data}
+    assert engine._partial_ranges[key] <= set(engine._cache_order[key])
+    assert set(engine._fetched_at[key]) == set(engine._cache_order[key])
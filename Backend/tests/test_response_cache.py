@@ -0,0 +1,115 @@
+"""
+ResponseCache in-memory fallback (no REDIS_URL) and the cross-worker Redis lock
+"""
+
+import asyncio
+
+import pytest
+
+import services.response_cache as response_cache
+from services.response_cache import ResponseCache
+
+def test_memory_drops_expired_entries():
+    async def run():
+        cache = ResponseCache()
+        for i in range(1000):
+            await cache.set(f"key{i}", b"{}", 0)
+        await cache.set("live", b"{}", 60)
+        return cache
+
+    cache = asyncio.run(run())
+    assert list(cache.memory) == ["live"]
+    assert len(cache._memory_expiry) == 1
+
+def test_memory_is_bounded(monkeypatch):
+    monkeypatch.setattr(ResponseCache, 'MEMORY_MAX_ENTRIES', 3)
+
+    async def run():
+        cache = ResponseCache()
+        for i in range(10):
+            await cache.set(f"key{i}", b"{}", 60 + i)
+        for _ in range(10):
+            await cache.set("key9", b"{}", 120)
+        return cache
+
+    cache = asyncio.run(run())
+    assert sorted(cache.memory) == ["key7", "key8", "key9"]
+    assert len(cache._memory_expiry) <= 2 * ResponseCache.MEMORY_MAX_ENTRIES
+
+def test_concurrent_callers_share_one_uncacheable_compute():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b'{"attendees":[]}', False  # Empty result - never cached
+
+    async def run():
+        cache = ResponseCache()
+        return await asyncio.gather(*(cache.get_or_compute("attendees:x", compute, 60) for _ in range(8)))
+
+    bodies = asyncio.run(run())
+    assert len(calls) == 1
+    assert bodies == [b'{"attendees":[]}'] * 8
+
+def test_waiters_get_an_error_when_the_owner_is_cancelled():
+    async def compute():
+        await asyncio.sleep(1)
+        return b"{}", True
+
+    async def run():
+        cache = ResponseCache()
+        owner = asyncio.create_task(cache.get_or_compute("events:x", compute, 60))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("events:x", compute, 60))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await asyncio.gather(owner, waiter, return_exceptions=True), cache
+
+    (owner_result, waiter_result), cache = asyncio.run(run())
+    assert isinstance(owner_result, asyncio.CancelledError)
+    assert isinstance(waiter_result, RuntimeError)
+    assert not cache._inflight
+
+def _redis_caches(monkeypatch, count):
+    """ResponseCache instances sharing one fake Redis server, like separate workers"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lock scripts need Lua support
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(response_cache.aioredis, 'from_url', lambda url: fakeredis.FakeAsyncRedis(server=server))
+    return [ResponseCache("redis://fake") for _ in range(count)]
+
+def test_release_never_deletes_another_workers_lock(monkeypatch):
+    first, second = _redis_caches(monkeypatch, 2)
+
+    async def run():
+        token = await first.acquire_lock("events:x")
+        await first.redis.delete("lock:events:x")  # TTL ran out mid-compute
+        other_token = await second.acquire_lock("events:x")
+        await first.release_lock("events:x", token)
+        return other_token, await second.redis.get("lock:events:x")
+
+    other_token, held = asyncio.run(run())
+    assert other_token and held == other_token.encode()
+
+def test_lock_is_extended_while_computing(monkeypatch):
+    monkeypatch.setattr(ResponseCache, 'LOCK_TTL_SECONDS', 0.3)
+    first, second = _redis_caches(monkeypatch, 2)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(1)  # Outlives the lock TTL several times over
+        return b'{"events":[1]}', True
+
+    async def run():
+        owner = asyncio.create_task(first.get_or_compute("events:x", compute, 60))
+        await asyncio.sleep(0.1)
+        waiter = asyncio.create_task(second.get_or_compute("events:x", compute, 60))
+        bodies = await asyncio.gather(owner, waiter)
+        return bodies, await first.redis.get("lock:events:x")
+
+    bodies, lock = asyncio.run(run())
+    assert len(calls) == 1
+    assert bodies == [b'{"events":[1]}'] * 2
+    assert lock is None
@@ -1,6 +1,7 @@
 const API_BASE_URL = 'http://localhost:8000/api';
 let currentEvents = [];
 let currentAttendees = [];
+const responseCache = new Map();  // request body -> { etag, result }
 
 document.addEventListener('DOMContentLoaded', function() {
     initializeDates();
@@ -69,21 +70,14 @@ async function discoverEvents() {
     showLoading(`Discovering ${maxResults} events in ${location}...`);
 
     try {
-        const response = await fetch(`${API_BASE_URL}/discover-events`, {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                location,
-                start_date: startDate,
-                end_date: endDate,
-                categories,
-                max_results: maxResults
-            })
+        const result = await postJSON(`${API_BASE_URL}/discover-events`, {
+            location,
+            start_date: startDate,
+            end_date: endDate,
+            categories,
+            max_results: maxResults
         });
 
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        const result = await response.json();
-
         if (result.success) {
             currentEvents = result.events || [];
             displayEvents(currentEvents, result);
@@ -165,18 +159,11 @@ async function discoverAttendees() {
     showLoading(`Finding ${maxResults} attendees for "${eventName}"...`);
 
     try {
-        const response = await fetch(`${API_BASE_URL}/discover-attendees`, {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                event_name: eventName,
-                max_results: maxResults
-            })
+        const result = await postJSON(`${API_BASE_URL}/discover-attendees`, {
+            event_name: eventName,
+            max_results: maxResults
         });
 
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        const result = await response.json();
-
         if (result.success) {
             currentAttendees = result.attendees || [];
             displayAttendees(currentAttendees, result);
@@ -247,6 +234,25 @@ function analyzeAttendees(eventName, eventIndex) {
 }
 
 // Utility Functions
+async function postJSON(url, payload) {
+    // Revalidate with the last ETag so unchanged results come back as an empty 304
+    const body = JSON.stringify(payload);
+    const cacheKey = `${url} ${body}`;
+    const cached = responseCache.get(cacheKey);
+    const headers = {'Content-Type': 'application/json'};
+    if (cached) headers['If-None-Match'] = cached.etag;
+
+    const response = await fetch(url, { method: 'POST', headers, body });
+
+    if (response.status === 304 && cached) return cached.result;
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+    const result = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) responseCache.set(cacheKey, { etag, result });
+    return result;
+}
+
 function showLoading(text) {
     document.getElementById('loadingText').textContent = text;
     document.getElementById('loadingModal').classList.remove('hidden');